@@ -1,4 +1,5 @@
 from flask import Flask, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import subprocess
 import os
@@ -7,33 +8,72 @@ import time
 from datetime import datetime, timedelta
 import uuid
 import queue
+import itertools
 import logging
-from collections import defaultdict
+import json
+import hashlib
+import bisect
+import sqlite3
+from collections import OrderedDict, deque
 from enum import Enum
 import signal
 import platform
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson  # Optional - much faster JSON encoding for leaderboard/job listings
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress  # Optional - gzip/brotli for the large JSON listings
+except ImportError:
+    Compress = None
+
+# Configure logging - FLAPPY_DEBUG=1 turns on the per-request and per-poll debug output
+logging.basicConfig(level=logging.DEBUG if os.environ.get('FLAPPY_DEBUG') == '1' else logging.INFO)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (used only when orjson is installed)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+if Compress is not None:
+    # Only JSON bodies over 1KB are worth compressing; small status polls go out as-is
+    app.config.update(
+        COMPRESS_ALGORITHM=['br', 'gzip'],
+        COMPRESS_MIMETYPES=['application/json'],
+        COMPRESS_MIN_SIZE=1024,
+        COMPRESS_LEVEL=6
+    )
+    Compress(app)
 CORS(app)
 
-# REQUEST LOGGING MIDDLEWARE - Debug frontend duplicate submissions
+# REQUEST LOGGING MIDDLEWARE - Debug frontend duplicate submissions (FLAPPY_DEBUG=1)
 @app.before_request
 def log_request_info():
-    if request.endpoint == 'submit_score':
-        logger.info(f" FRONTEND REQUEST: {request.method} {request.url}")
-        logger.info(f" Headers: {dict(request.headers)}")
-        try:
-            data = request.get_json()
-            logger.info(f" Request Data: {data}")
-        except:
-            logger.info(f" Request Data: <could not parse JSON>")
-        logger.info(f" Timestamp: {datetime.now().isoformat()}")
-        logger.info(f" Remote Addr: {request.remote_addr}")
-        logger.info(f" User Agent: {request.headers.get('User-Agent', 'Unknown')}")
+    if request.endpoint == 'submit_score' and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(" FRONTEND REQUEST: %s %s", request.method, request.url)
+        logger.debug(" Headers: %s", dict(request.headers))
+        # silent=True returns None for bad JSON; the parsed body is cached for submit_score
+        logger.debug(" Request Data: %s", request.get_json(silent=True))
+        logger.debug(" Remote Addr: %s", request.remote_addr)
+        logger.debug(" User Agent: %s", request.headers.get('User-Agent', 'Unknown'))
 
 class ProofStatus(Enum):
     PENDING = "pending"
@@ -43,168 +83,476 @@ class ProofStatus(Enum):
     TIMEOUT = "timeout"
 
 # Global variables - ONLY for real submitted data
-leaderboard = defaultdict(list)  # Only real submitted scores
-proof_jobs = {}  # {job_id: ProofJob} - Only real proof jobs
-proof_queue = queue.Queue()  # Only real proof generation requests
+leaderboard = {}  # {difficulty: [entry, ...]} Only real submitted scores, kept sorted best-first
+leaderboard_keys = {}  # {difficulty: [-score, ...]} parallel to leaderboard, for bisect
+# Plain dicts - only insert_leaderboard_entry creates a difficulty, so reads never add empty boards
+LEADERBOARD_MAX_ENTRIES = 1000  # Keep top 1000 scores per difficulty
+leaderboard_total_scores = 0  # Entries across all difficulties, maintained on insert
+MIN_SCORE, MAX_SCORE = 1, 1000  # The ZisK guest (flappy_zisk/src/main.rs) panics on anything outside this range
+DIFFICULTY_LEVELS = (1, 2, 3)  # Accepted difficulty values - the game itself submits 1
+
+# Fields served by the leaderboard endpoints - proof paths/errors stay behind /api/proof-status
+LEADERBOARD_FIELDS = ('job_id', 'player_id', 'score', 'difficulty', 'game_id', 'timestamp', 'proof_status', 'proof_completed_at')
+leaderboard_views = {}  # {job_id: projected entry} - built once, dropped when the entry changes or leaves
+leaderboard_response_cache = {}  # {difficulty: (encoded GET /api/leaderboard/<difficulty> body, etag)} - dropped on any write
+ALL_LEADERBOARDS_CACHE_KEY = 'all'  # leaderboard_response_cache slot for GET /api/leaderboard (difficulties are ints)
+proof_jobs = {}  # {job_id: ProofJob} - Only real proof jobs, in creation order
+proof_jobs_by_request_id = {}  # {request_id: ProofJob} - index for the request_id duplicate check
+active_proof_jobs = {}  # {job_id: ProofJob} - pending/in-progress jobs only, in creation order
+proof_status_counts = {status: 0 for status in ProofStatus}  # Jobs per status, maintained on every transition
+proof_queue = queue.SimpleQueue()  # Only real proof generation requests - nothing join()s it, so no task_done bookkeeping
 active_proof_workers = {}  # {thread_id: ProofJob}
 
 # DEDUPLICATION SYSTEM
-recent_submissions = {}  # {(player_id, score, difficulty): {'timestamp': datetime, 'job_id': str}}
+recent_submissions = OrderedDict()  # {(player_id, score, difficulty): {'timestamp': time.monotonic() seconds, 'job_id': str}}, oldest first
 DEDUP_WINDOW_SECONDS = 30  # Prevent same score within 30 seconds
+DEDUP_MAX_ENTRIES = 10000  # Hard cap on recent_submissions between sweeps - the oldest entries go first
+
+# ZisK paths - resolved once at import; ZISK_SCRIPT_PATH may point at another checkout
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ZISK_SCRIPT_PATH = os.path.abspath(os.environ.get('ZISK_SCRIPT_PATH', os.path.join(BASE_DIR, "generate_zk_proof_fixed.sh")))
+ZISK_SCRIPT_DIR = os.path.dirname(ZISK_SCRIPT_PATH)
+ZISK_SCRIPT_ARGV = ('bash', ZISK_SCRIPT_PATH)  # Explicitly use bash (no exec bit needed); the score is appended per job
+ZISK_BASE_ENV = dict(os.environ)  # Decoded once; each run only adds GAME_SCORE
+ZISK_PROJECT_DIR = os.path.join(ZISK_SCRIPT_DIR, "flappy_zisk")  # The script always works in flappy_zisk next to itself
+PROOF_DIR = os.path.join(ZISK_PROJECT_DIR, "proof")
+PROOF_FILE = os.path.join(PROOF_DIR, "vadcop_final_proof.bin")
+PROOF_LOG_DIR = os.path.join(ZISK_PROJECT_DIR, "proof_logs")  # Full script output, one file per job
+PROOF_LOG_MAX_FILES = 256  # Newest proof logs kept on disk; older ones are deleted as new jobs run
+PROOF_OUTPUT_TAIL_BYTES = 64 * 1024  # Only the end of the output is kept in memory on the job
+
+# OPTIONAL PERSISTENCE - set LEADERBOARD_DB_PATH to keep leaderboard scores across restarts
+LEADERBOARD_DB_PATH = os.environ.get('LEADERBOARD_DB_PATH')
+LEADERBOARD_DB_COLUMNS = ('job_id', 'player_id', 'score', 'difficulty', 'game_id', 'timestamp',
+                          'proof_status', 'proof_completed_at', 'proof_file_path', 'proof_error')
+LEADERBOARD_DB_UPSERT = (
+    f"INSERT INTO scores ({', '.join(LEADERBOARD_DB_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(LEADERBOARD_DB_COLUMNS))}) "
+    f"ON CONFLICT(job_id) DO UPDATE SET "
+    + ', '.join(f"{column} = excluded.{column}" for column in LEADERBOARD_DB_COLUMNS if column != 'job_id')
+)
+leaderboard_db = None  # sqlite3 connection once init_leaderboard_db() has run
+
+# Overall ceiling for one ZisK proof run (script + build + prove + verify)
+ZISK_PROOF_TIMEOUT_SECONDS = int(os.environ.get('ZISK_PROOF_TIMEOUT_SECS', 2700))  # 45 minutes by default
+ZISK_PROGRESS_LOG_SECONDS = 30  # How often a running proof logs progress
+
+# Proof worker threads - ZisK runs one proof at a time and the prover uses every core itself,
+# so extra workers only queue on zisk_execution_lock; two keep a job ready behind the running one
+PROOF_WORKER_COUNT = max(1, int(os.environ.get('ZISK_WORKERS', 2)))
+
+proof_log_jobs = deque()  # Jobs whose proof log is still on disk, oldest first
 
 # Thread synchronization
 leaderboard_lock = threading.RLock()
 proof_jobs_lock = threading.RLock()
 dedup_lock = threading.RLock()  # Protect deduplication data
 zisk_execution_lock = threading.Lock()  # Ensure only one ZisK process runs at a time
+shutdown_event = threading.Event()  # Set on shutdown - wakes the worker monitor immediately
+
+def isoformat_timestamp(timestamp):
+    """ISO 8601 (local time) rendering of an epoch timestamp, or None"""
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
 
-def generate_game_id(job_id, score):
+def generate_game_id(job_uuid, score, created_at=None):
     """Generate unique game session ID for tamper-proof binding"""
-    timestamp = int(time.time())
-    # Include job_id hash for uniqueness
-    random_part = hash(job_id) % (2**20)  # 20 bits
+    timestamp = int(created_at if created_at is not None else time.time())
+    # The job's uuid4 is already random - its low 20 bits need no hashing (version/variant bits sit higher)
+    random_part = job_uuid.int & 0xFFFFF  # 20 bits
     return (timestamp << 20) | random_part
 
+def invalidate_leaderboard_responses(difficulty):
+    """Drop the cached responses that include this difficulty (caller holds leaderboard_lock)"""
+    leaderboard_response_cache.pop(difficulty, None)
+    leaderboard_response_cache.pop(ALL_LEADERBOARDS_CACHE_KEY, None)
+
+def match_if_none_match(etag):
+    """Return the If-None-Match tag naming this ETag, or None.
+    
+    flask-compress sends compressed bodies out as "<etag>:gzip" / "<etag>:br", and clients echo
+    that form back - the ":<algorithm>" suffix is ignored so those revalidations match too. The
+    comparison is weak (RFC 9110 requires it for If-None-Match), so W/"<etag>" matches as well.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return etag
+    for tag in if_none_match.as_set(include_weak=True):
+        if tag.split(':', 1)[0] == etag:
+            return tag
+    return None
+
+def cached_json_response(cached):
+    """Serve a cached (body, etag) pair, answering a matching If-None-Match with 304"""
+    body, etag = cached
+    matched_etag = match_if_none_match(etag)
+    if matched_etag is not None:
+        # Unchanged since the client's last poll - skip the body entirely, and repeat the tag the
+        # client holds (304s aren't compressed, so flask-compress won't re-suffix it)
+        response = app.response_class(status=304)
+        response.set_etag(matched_etag, weak=request.if_none_match.is_weak(matched_etag))
+    else:
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+    return response
+
+def insert_leaderboard_entry(difficulty, entry):
+    """Insert a score into its sorted leaderboard (caller holds leaderboard_lock).
+    
+    Returns the 1-based leaderboard position, or None if the score did not make the cut.
+    """
+    global leaderboard_total_scores
+    
+    keys = leaderboard_keys.setdefault(difficulty, [])
+    key = -entry['score']
+    
+    # Full board and no better than the current last place - reject in O(1) like a bounded heap would
+    if len(keys) >= LEADERBOARD_MAX_ENTRIES and key >= keys[-1]:
+        return None
+    
+    index = bisect.bisect_right(keys, key)  # Equal scores keep submission order
+    
+    scores = leaderboard.setdefault(difficulty, [])
+    keys.insert(index, key)
+    scores.insert(index, entry)
+    invalidate_leaderboard_responses(difficulty)
+    
+    if len(keys) > LEADERBOARD_MAX_ENTRIES:
+        keys.pop()
+        evicted = scores.pop()
+        evicted['evicted'] = True  # Late proof results for it are no longer stored
+        leaderboard_views.pop(evicted['job_id'], None)
+        delete_leaderboard_entry(evicted['job_id'])  # Keep the store capped like the board
+    else:
+        leaderboard_total_scores += 1
+    
+    return index + 1
+
+def record_leaderboard_score(job):
+    """Add a newly submitted job's score to its leaderboard with a pending proof and persist it
+    
+    Returns the 1-based leaderboard position, or None if the score did not make the cut.
+    """
+    entry = {
+        'job_id': job.job_id,
+        'player_id': job.player_id,
+        'score': job.score,
+        'difficulty': job.difficulty,
+        'game_id': job.game_id,
+        'timestamp': isoformat_timestamp(job.created_at),  # Submission time, read from the clock once per request
+        'proof_status': ProofStatus.PENDING.value,
+        'proof_file_path': None
+    }
+    
+    with leaderboard_lock:
+        # Position comes straight from the bisect insert - no scan of the leaderboard
+        position = insert_leaderboard_entry(job.difficulty, entry)
+        if position is not None:  # Scores that didn't make the board aren't stored either
+            save_leaderboard_entry(entry)
+    
+    job.leaderboard_entry = entry if position is not None else None  # Proof completion updates this entry directly
+    
+    return position
+
+def init_leaderboard_db(db_path):
+    """Open the SQLite leaderboard store (WAL mode) and load the saved scores into memory"""
+    global leaderboard_db
+    
+    connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)  # Autocommit
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS scores (
+            job_id TEXT PRIMARY KEY,
+            player_id TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            difficulty INTEGER NOT NULL,
+            game_id INTEGER,
+            timestamp TEXT NOT NULL,
+            proof_status TEXT NOT NULL,
+            proof_completed_at TEXT,
+            proof_file_path TEXT,
+            proof_error TEXT
+        )
+    ''')
+    connection.execute('CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (difficulty, score DESC)')
+    
+    # Proof jobs live in memory only - proofs still running at shutdown can never complete
+    connection.execute(
+        'UPDATE scores SET proof_status = ?, proof_error = ? WHERE proof_status IN (?, ?)',
+        (ProofStatus.FAILED.value, 'Server restarted before the proof completed',
+         ProofStatus.PENDING.value, ProofStatus.IN_PROGRESS.value)
+    )
+    rows = connection.execute(
+        f"SELECT {', '.join(LEADERBOARD_DB_COLUMNS)} FROM scores ORDER BY difficulty, score DESC, rowid"
+    ).fetchall()
+    
+    rejected_job_ids = []
+    with leaderboard_lock:
+        for row in rows:
+            entry = dict(zip(LEADERBOARD_DB_COLUMNS, row))
+            if insert_leaderboard_entry(entry['difficulty'], entry) is None:
+                rejected_job_ids.append((entry['job_id'],))
+        leaderboard_db = connection
+    
+    # Rows past LEADERBOARD_MAX_ENTRIES per difficulty (e.g. from before the store was capped)
+    if rejected_job_ids:
+        connection.executemany('DELETE FROM scores WHERE job_id = ?', rejected_job_ids)
+    
+    logger.info(f"Leaderboard store {db_path} opened, loaded {len(rows)} saved scores")
+
+def save_leaderboard_entry(entry):
+    """Write-through of a leaderboard entry to SQLite (caller holds leaderboard_lock)"""
+    if leaderboard_db is None:
+        return
+    
+    try:
+        # Upsert in place - INSERT OR REPLACE would give the row a new rowid, and rowid is the
+        # tie-break that restores equal scores in submission order on reload
+        leaderboard_db.execute(LEADERBOARD_DB_UPSERT, tuple(entry.get(column) for column in LEADERBOARD_DB_COLUMNS))
+    except (sqlite3.Error, OverflowError, ValueError) as e:  # Values SQLite can't bind fail as Python errors
+        logger.error(f"Could not persist leaderboard entry for job {entry.get('job_id')}: {e}")
+
+def delete_leaderboard_entry(job_id):
+    """Remove an entry that left the in-memory board from SQLite (caller holds leaderboard_lock)"""
+    if leaderboard_db is None:
+        return
+    
+    try:
+        leaderboard_db.execute('DELETE FROM scores WHERE job_id = ?', (job_id,))
+    except sqlite3.Error as e:
+        logger.error(f"Could not delete leaderboard entry for job {job_id}: {e}")
+
+def project_leaderboard_entry(entry):
+    """Public view of a leaderboard entry, reused across reads (caller holds leaderboard_lock)"""
+    view = leaderboard_views.get(entry['job_id'])
+    if view is None:
+        view = {field: entry.get(field) for field in LEADERBOARD_FIELDS}
+        leaderboard_views[entry['job_id']] = view
+    return view
+
+def read_proof_log_tail(log_path):
+    """Read the last PROOF_OUTPUT_TAIL_BYTES of a proof log without loading the whole file"""
+    try:
+        with open(log_path, 'rb') as log_file:
+            log_file.seek(0, os.SEEK_END)
+            log_file.seek(max(0, log_file.tell() - PROOF_OUTPUT_TAIL_BYTES))
+            return log_file.read().decode(errors='replace')
+    except OSError:
+        return ''
+
+def record_submission(dedup_key, data):
+    """Remember a submission for deduplication, keeping recent_submissions oldest first (caller holds dedup_lock)"""
+    recent_submissions[dedup_key] = data
+    recent_submissions.move_to_end(dedup_key)
+    
+    if len(recent_submissions) > DEDUP_MAX_ENTRIES:
+        recent_submissions.popitem(last=False)
+
+def duplicate_submission_response(player_id, score, last_submission, time_diff):
+    """429 answer for a submission inside the dedup window of an identical one"""
+    wait_time = DEDUP_WINDOW_SECONDS - time_diff
+    logger.warning("🚫 DUPLICATE BLOCKED: Player %s, Score %s within %.1fs (wait %.1fs)", player_id, score, time_diff, wait_time)
+    return jsonify({
+        'success': False,
+        'error': f'Duplicate submission blocked. Same score submitted {time_diff:.1f}s ago. Wait {wait_time:.1f}s.',
+        'blocked': True,
+        'existing_job_id': last_submission['job_id'],
+        'time_remaining': wait_time
+    }), 429  # Too Many Requests
+
 def cleanup_old_dedup_entries():
     """Clean up expired deduplication entries to prevent memory bloat"""
-    current_time = datetime.now()
-    expired_keys = []
+    current_time = time.monotonic()
+    expired_count = 0
     
     with dedup_lock:
-        for key, data in recent_submissions.items():
-            if (current_time - data['timestamp']).total_seconds() > DEDUP_WINDOW_SECONDS:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del recent_submissions[key]
+        # Entries are in submission order - stop at the first one still inside the window
+        while recent_submissions:
+            data = next(iter(recent_submissions.values()))
+            if current_time - data['timestamp'] <= DEDUP_WINDOW_SECONDS:
+                break
+            recent_submissions.popitem(last=False)
+            expired_count += 1
     
-    if expired_keys:
-        logger.info(f"🧹 Cleaned up {len(expired_keys)} expired deduplication entries")
+    if expired_count:
+        logger.info(f"🧹 Cleaned up {expired_count} expired deduplication entries")
+
+def remove_stale_files(directory):
+    """Delete the files a previous server run left in one of our generated directories"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0  # Nothing generated yet
+    
+    removed = 0
+    for name in names:
+        try:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def rotate_proof_logs(job):
+    """Track a new proof log and delete the oldest ones past PROOF_LOG_MAX_FILES (caller holds zisk_execution_lock)"""
+    proof_log_jobs.append(job)
+    
+    while len(proof_log_jobs) > PROOF_LOG_MAX_FILES:
+        old_job = proof_log_jobs.popleft()
+        with proof_jobs_lock:
+            old_log_path, old_job.proof_log_path = old_job.proof_log_path, None
+        try:
+            os.remove(old_log_path)
+        except OSError:
+            pass
+
+def add_proof_job(job):
+    """Register a new job with the status counters and indexes (caller holds proof_jobs_lock)"""
+    proof_jobs[job.job_id] = job
+    proof_status_counts[job.status] += 1
+    if job.status in ACTIVE_PROOF_STATUSES:
+        active_proof_jobs[job.job_id] = job
+    if job.request_id:
+        proof_jobs_by_request_id[job.request_id] = job
+
+def set_job_status(job, status):
+    """Move a job to a new status, keeping the status counters and active job index in step (caller holds proof_jobs_lock)
+    
+    Also the publish step for the job's other to_dict() fields - call it after writing them, even
+    when the status itself stays the same.
+    """
+    if job.status is not status:
+        proof_status_counts[job.status] -= 1
+        proof_status_counts[status] += 1
+        job.status = status
+    job._dict_cache = None  # Rebuilt from the fields just published
+    
+    if status not in ACTIVE_PROOF_STATUSES:
+        active_proof_jobs.pop(job.job_id, None)
 
 class ProofJob:
-    def __init__(self, job_id, player_id, score, difficulty, request_id=None):
+    # Fixed attribute set - no per-job __dict__, jobs are kept for the life of the process
+    __slots__ = ('job_id', 'player_id', 'score', 'difficulty', 'status', 'created_at', 'started_at',
+                 'completed_at', 'proof_output', 'error_message', 'proof_file_path', 'process_pid',
+                 'process_group_pid', 'proof_log_path', 'game_id', 'request_id', 'leaderboard_entry',
+                 '_dict_cache')
+    
+    def __init__(self, job_id, player_id, score, difficulty, request_id=None, created_at=None):
         self.job_id = job_id
         self.player_id = player_id
         self.score = score
         self.difficulty = difficulty
         self.status = ProofStatus.PENDING
-        self.created_at = datetime.now()
+        self.created_at = created_at if created_at is not None else time.time()  # Epoch seconds, like all job timestamps
         self.started_at = None
         self.completed_at = None
         self.proof_output = None
         self.error_message = None
         self.proof_file_path = None
         self.process_pid = None
+        self.process_group_pid = None
+        self.proof_log_path = None  # Full ZisK script output on disk
         self.game_id = None  # Will be set after creation
         self.request_id = request_id  # Client-provided unique request ID for deduplication
+        self.leaderboard_entry = None  # Set by record_leaderboard_score
+        self._dict_cache = None  # to_dict() result, cleared by set_job_status on every publish
         
     def to_dict(self):
-        return {
+        """Serializable view of the job, reused until the next set_job_status call - don't mutate it"""
+        if self._dict_cache is not None:
+            return self._dict_cache
+        
+        self._dict_cache = {
             'job_id': self.job_id,
             'player_id': self.player_id,
             'score': self.score,
             'difficulty': self.difficulty,
             'game_id': self.game_id,
             'status': self.status.value,
-            'created_at': self.created_at.isoformat(),
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': isoformat_timestamp(self.created_at),
+            'started_at': isoformat_timestamp(self.started_at),
+            'completed_at': isoformat_timestamp(self.completed_at),
             'duration_seconds': (
-                (self.completed_at - self.started_at).total_seconds() 
+                self.completed_at - self.started_at
                 if self.completed_at and self.started_at else None
             ),
             'proof_file_path': self.proof_file_path,
             'error_message': self.error_message
         }
+        return self._dict_cache
 
 def proof_worker():
     """Bulletproof worker thread that processes real proof generation jobs"""
     thread_id = threading.get_ident()
     worker_name = f"Worker-{thread_id}"
-    start_time = time.time()  # Track when worker started
-    logger.info(f"{worker_name} started and ready for jobs")
+    logger.info("%s started and ready for jobs", worker_name)
     
     job_count = 0
     
     while True:
         job = None  # Initialize job variable
-        job_processed = False
         
         try:
             # Get next REAL job from queue (blocks until available)
-            logger.info(f"{worker_name} waiting for next job...")
-            job = proof_queue.get(timeout=30)  # Reduced timeout to prevent hanging
+            logger.debug("%s waiting for next job...", worker_name)
+            job = proof_queue.get()  # Idle workers sleep here; shutdown sends a None poison pill per worker
             
             if job is None:  # Poison pill to stop worker
-                logger.info(f"{worker_name} received shutdown signal")
+                logger.info("%s received shutdown signal", worker_name)
                 break
             
             job_count += 1
-            logger.info(f"{worker_name} got job #{job_count}: {job.job_id} (score: {job.score})")
+            logger.info("%s got job #%s: %s (score: %s)", worker_name, job_count, job.job_id, job.score)
             
             # Mark job as in progress
             try:
                 with proof_jobs_lock:
+                    job.started_at = time.time()  # Set before publishing - worker-status reads the entry without the lock
+                    set_job_status(job, ProofStatus.IN_PROGRESS)
                     active_proof_workers[thread_id] = job
-                    job.status = ProofStatus.IN_PROGRESS
-                    job.started_at = datetime.now()
-                    proof_jobs[job.job_id] = job
                 
-                logger.info(f"{worker_name} starting proof generation for job {job.job_id}")
+                logger.info("%s starting proof generation for job %s", worker_name, job.job_id)
                 
                 # Generate the REAL ZisK proof with extra protection
                 result = generate_real_zisk_proof_safe(job, worker_name)
-                job_processed = True
                 
-                # Update job status based on result
+                # Work out the final state first, then publish it in one short critical section
+                completed_at = time.time()
+                if result['success']:
+                    final_status = ProofStatus.COMPLETED
+                    logger.info("%s SUCCESSFULLY completed job %s", worker_name, job.job_id)
+                else:
+                    final_status = ProofStatus.FAILED
+                    logger.error(f"{worker_name} FAILED job {job.job_id}: {result.get('error', 'Unknown error')}")
+                
                 with proof_jobs_lock:
                     if result['success']:
-                        job.status = ProofStatus.COMPLETED
                         job.proof_output = result.get('output', '')
                         job.proof_file_path = result.get('proof_file_path')
-                        logger.info(f"{worker_name} SUCCESSFULLY completed job {job.job_id}")
                     else:
-                        job.status = ProofStatus.FAILED
                         job.error_message = result.get('error', 'Unknown error')
-                        logger.error(f"{worker_name} FAILED job {job.job_id}: {job.error_message}")
-                    
-                    job.completed_at = datetime.now()
-                    proof_jobs[job.job_id] = job
-                    
-                    # Remove from active workers
-                    if thread_id in active_proof_workers:
-                        del active_proof_workers[thread_id]
+                    job.completed_at = completed_at
+                    if job.status is ProofStatus.TIMEOUT:
+                        final_status = ProofStatus.TIMEOUT  # Keep the more specific timeout status
+                    set_job_status(job, final_status)  # Publishes the fields above, even when the status stays put
+                    active_proof_workers.pop(thread_id, None)
                 
                 # Update leaderboard
                 update_leaderboard_with_real_proof(job)
                 
             except Exception as job_error:
                 logger.error(f"{worker_name} exception during job {job.job_id}: {job_error}")
-                job_processed = True  # We attempted to process it
                 
                 # Mark job as failed
                 try:
                     with proof_jobs_lock:
-                        job.status = ProofStatus.FAILED
                         job.error_message = f"Worker exception: {str(job_error)}"
-                        job.completed_at = datetime.now()
-                        if thread_id in active_proof_workers:
-                            del active_proof_workers[thread_id]
-                        proof_jobs[job.job_id] = job
+                        job.completed_at = time.time()
+                        set_job_status(job, ProofStatus.FAILED)
+                        active_proof_workers.pop(thread_id, None)
                 except:
                     pass  # Don't let cleanup errors kill the worker
             
-        except queue.Empty:
-            # No jobs available - this is normal, keep waiting
-            logger.debug(f"{worker_name} no jobs available, continuing to wait...")
-            
-            # Check if this worker should terminate (prevent infinite hanging)
-            if job_count == 0 and time.time() - start_time > 300:  # 5 minutes without any jobs
-                logger.warning(f"{worker_name} terminating due to inactivity (no jobs in 5 minutes)")
-                break
-                
-            continue
-            
         except Exception as worker_error:
             # Critical worker error - log but don't die
             logger.error(f"{worker_name} critical error: {worker_error}")
@@ -214,66 +562,55 @@ def proof_worker():
             if job is not None:
                 try:
                     with proof_jobs_lock:
-                        job.status = ProofStatus.FAILED
                         job.error_message = f"Worker critical error: {str(worker_error)}"
-                        job.completed_at = datetime.now()
-                        if thread_id in active_proof_workers:
-                            del active_proof_workers[thread_id]
-                        proof_jobs[job.job_id] = job
-                    job_processed = True
+                        job.completed_at = time.time()
+                        set_job_status(job, ProofStatus.FAILED)
+                        active_proof_workers.pop(thread_id, None)
                 except:
                     pass  # Don't let cleanup kill worker
         
-        finally:
-            # Always mark queue task as done if we got a job
-            if job is not None and job_processed:
-                try:
-                    proof_queue.task_done()
-                    logger.debug(f"{worker_name} marked job {job.job_id} as done in queue")
-                except Exception as cleanup_error:
-                    logger.error(f"{worker_name} error marking task done: {cleanup_error}")
-        
         # Small delay between jobs to prevent resource conflicts
         time.sleep(1)
     
-    logger.info(f"{worker_name} stopped after processing {job_count} jobs")
+    logger.info("%s stopped after processing %s jobs", worker_name, job_count)
 
 def generate_real_zisk_proof_safe(job, worker_name):
     """Generate REAL ZisK proof with enhanced safety and cleanup (psutil-free)"""
     process = None
     
     # CRITICAL: Acquire ZisK execution lock to ensure only one ZisK process runs at a time
-    logger.info(f"{worker_name} waiting for ZisK execution lock...")
+    logger.info("%s waiting for ZisK execution lock...", worker_name)
     with zisk_execution_lock:
-        logger.info(f"{worker_name} acquired ZisK execution lock, starting proof generation")
+        logger.info("%s acquired ZisK execution lock, starting proof generation", worker_name)
         
         try:
-            logger.info(f"{worker_name} starting REAL ZisK proof for job {job.job_id}, score: {job.score}")
-            
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            script_path = os.path.join(current_dir, "generate_zk_proof_fixed.sh")
+            logger.info("%s starting REAL ZisK proof for job %s, score: %s", worker_name, job.job_id, job.score)
             
-            if not os.path.exists(script_path):
+            if not os.path.exists(ZISK_SCRIPT_PATH):
                 return {
                     "success": False,
-                    "error": f"ZisK proof script not found at {script_path}"
+                    "error": f"ZisK proof script not found at {ZISK_SCRIPT_PATH}"
                 }
             
-            # Make script executable
-            os.chmod(script_path, 0o755)
+            logger.info("%s executing: %s %s", worker_name, ZISK_SCRIPT_PATH, job.score)
             
-            logger.info(f"{worker_name} executing: {script_path} {job.score}")
+            # Script output goes straight to disk rather than being buffered in memory
+            os.makedirs(PROOF_LOG_DIR, exist_ok=True)
+            log_path = os.path.join(PROOF_LOG_DIR, f"{job.job_id}.log")
+            with proof_jobs_lock:
+                job.proof_log_path = log_path
+            rotate_proof_logs(job)
             
             # Create the process with better isolation using process groups
-            process = subprocess.Popen(
-                ['bash', script_path, str(job.score)],  # Explicitly use bash
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=current_dir,
-                env=dict(os.environ, GAME_SCORE=str(job.score)),  # Ensure environment variable is set
-                start_new_session=True  # Creates new process group for better isolation
-            )
+            with open(log_path, 'wb') as log_file:
+                process = subprocess.Popen(
+                    [*ZISK_SCRIPT_ARGV, str(job.score)],
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    cwd=ZISK_SCRIPT_DIR,
+                    env=dict(ZISK_BASE_ENV, GAME_SCORE=str(job.score)),  # Ensure environment variable is set
+                    start_new_session=True  # Creates new process group for better isolation
+                )
             
             # Store PID and process group PID for monitoring and cleanup
             with proof_jobs_lock:
@@ -285,101 +622,101 @@ def generate_real_zisk_proof_safe(job, worker_name):
                     # Fallback to process PID if process group not available
                     job.process_group_pid = process.pid
             
-            logger.info(f"{worker_name} started ZisK process PID: {process.pid}, PGID: {job.process_group_pid}")
+            logger.info("%s started ZisK process PID: %s, PGID: %s", worker_name, process.pid, job.process_group_pid)
             
             try:
                 # Wait with timeout and periodic logging
                 start_time = time.time()
-                timeout_seconds = 2700  # 45 minutes
+                timeout_seconds = ZISK_PROOF_TIMEOUT_SECONDS
                 
                 while True:
                     try:
-                        # Check if process is done (non-blocking)
-                        stdout, stderr = process.communicate(timeout=30)
+                        # Never wait past the overall deadline
+                        remaining = timeout_seconds - (time.time() - start_time)
+                        process.wait(timeout=max(1, min(ZISK_PROGRESS_LOG_SECONDS, remaining)))
                         # If we get here, process completed
                         break
                     except subprocess.TimeoutExpired:
                         # Process still running, log progress
                         elapsed = time.time() - start_time
-                        logger.info(f"{worker_name} job {job.job_id} still running... ({elapsed:.0f}s elapsed)")
+                        logger.info("%s job %s still running... (%.0fs elapsed)", worker_name, job.job_id, elapsed)
                         
-                        if elapsed > timeout_seconds:
+                        if elapsed >= timeout_seconds:
                             # Timeout reached
-                            logger.warning(f"{worker_name} job {job.job_id} timed out after {elapsed:.0f}s")
+                            logger.warning("%s job %s timed out after %.0fs", worker_name, job.job_id, elapsed)
                             raise subprocess.TimeoutExpired(process.args, timeout_seconds)
                         
                         # Check if process died unexpectedly
                         if process.poll() is not None:
-                            # Process ended, get output
-                            stdout, stderr = process.communicate()
                             break
                 
                 exit_code = process.returncode
-                logger.info(f"{worker_name} ZisK process completed with exit code: {exit_code}")
+                output = read_proof_log_tail(log_path)
+                logger.info("%s ZisK process completed with exit code: %s", worker_name, exit_code)
                 
                 if exit_code == 0:
                     # Check for REAL proof file
-                    proof_dir = os.path.join(current_dir, "flappy_zisk", "proof")
-                    proof_file = os.path.join(proof_dir, "vadcop_final_proof.bin")
-                    
-                    logger.info(f"{worker_name} checking for proof file: {proof_file}")
+                    logger.info("%s checking for proof file: %s", worker_name, PROOF_FILE)
                     
-                    # Wait a bit for file system to sync
-                    time.sleep(2)
+                    # The script has exited, so the proof is normally visible already - only wait
+                    # (up to 2s) if it isn't, instead of holding the ZisK lock for a fixed 2s every run
+                    sync_deadline = time.time() + 2
+                    while not os.path.exists(PROOF_FILE) and time.time() < sync_deadline:
+                        time.sleep(0.1)
                     
-                    if os.path.exists(proof_file):
-                        file_size = os.path.getsize(proof_file)
+                    if os.path.exists(PROOF_FILE):
+                        file_size = os.path.getsize(PROOF_FILE)
                         if file_size > 0:
-                            logger.info(f"{worker_name} SUCCESS: Proof file generated ({file_size} bytes)")
+                            logger.info("%s SUCCESS: Proof file generated (%s bytes)", worker_name, file_size)
                             return {
                                 "success": True,
-                                "output": stdout,
-                                "proof_file_path": proof_file
+                                "output": output,
+                                "proof_file_path": PROOF_FILE
                             }
                         else:
                             logger.error(f"{worker_name} proof file exists but is empty")
                             return {
                                 "success": False,
                                 "error": "ZisK proof file generated but is empty",
-                                "output": stdout
+                                "output": output
                             }
                     else:
-                        logger.error(f"{worker_name} proof file not found at {proof_file}")
-                        logger.info(f"{worker_name} checking proof directory contents:")
+                        logger.error(f"{worker_name} proof file not found at {PROOF_FILE}")
+                        logger.debug("%s checking proof directory contents:", worker_name)
                         try:
-                            if os.path.exists(proof_dir):
-                                for f in os.listdir(proof_dir):
-                                    logger.info(f"  {f}")
+                            if os.path.exists(PROOF_DIR):
+                                for f in os.listdir(PROOF_DIR):
+                                    logger.debug("  %s", f)
                             else:
-                                logger.info(f"  Proof directory {proof_dir} does not exist")
+                                logger.debug("  Proof directory %s does not exist", PROOF_DIR)
                         except:
                             pass
                         
                         return {
                             "success": False,
                             "error": "ZisK proof file was not generated",
-                            "output": stdout
+                            "output": output
                         }
                 else:
                     logger.error(f"{worker_name} ZisK process failed with exit code {exit_code}")
                     return {
                         "success": False,
-                        "error": f"ZisK proof generation failed (exit code {exit_code}): {stderr}",
-                        "output": stdout
+                        "error": f"ZisK proof generation failed (exit code {exit_code}): {output[-2000:]}",
+                        "output": output
                     }
                     
             except subprocess.TimeoutExpired:
-                logger.warning(f"{worker_name} killing timed out ZisK process {process.pid}")
+                logger.warning("%s killing timed out ZisK process %s", worker_name, process.pid)
                 
                 # Kill process and cleanup
                 cleanup_process_safe(process, job, worker_name)
                 
                 with proof_jobs_lock:
-                    job.status = ProofStatus.TIMEOUT
+                    set_job_status(job, ProofStatus.TIMEOUT)
                 
                 return {
                     "success": False,
-                    "error": f"ZisK proof generation timed out after 45 minutes"
+                    "error": f"ZisK proof generation timed out after {ZISK_PROOF_TIMEOUT_SECONDS}s"
                 }
                 
         except Exception as e:
@@ -403,29 +740,29 @@ def cleanup_process_safe(process, job, worker_name):
     """Safely cleanup a subprocess using process groups (psutil-free)"""
     try:
         if process and process.poll() is None:  # Process still running
-            logger.info(f"{worker_name} terminating process {process.pid}")
+            logger.info("%s terminating process %s", worker_name, process.pid)
             
             # Try graceful termination first using process group
             try:
                 if job and job.process_group_pid:
                     # Kill entire process group gracefully
                     os.killpg(job.process_group_pid, signal.SIGTERM)
-                    logger.info(f"{worker_name} sent SIGTERM to process group {job.process_group_pid}")
+                    logger.info("%s sent SIGTERM to process group %s", worker_name, job.process_group_pid)
                 else:
                     # Fallback to individual process
                     process.terminate()
-                    logger.info(f"{worker_name} sent SIGTERM to process {process.pid}")
+                    logger.info("%s sent SIGTERM to process %s", worker_name, process.pid)
             except OSError as e:
-                logger.warning(f"{worker_name} error sending SIGTERM: {e}")
+                logger.warning("%s error sending SIGTERM: %s", worker_name, e)
                 # Process might already be dead
             
             # Wait a bit for graceful shutdown
             try:
                 process.wait(timeout=10)
-                logger.info(f"{worker_name} process {process.pid} terminated gracefully")
+                logger.info("%s process %s terminated gracefully", worker_name, process.pid)
             except subprocess.TimeoutExpired:
                 # Force kill using process group
-                logger.warning(f"{worker_name} force killing process group {job.process_group_pid if job else process.pid}")
+                logger.warning("%s force killing process group %s", worker_name, job.process_group_pid if job else process.pid)
                 try:
                     if job and job.process_group_pid:
                         os.killpg(job.process_group_pid, signal.SIGKILL)
@@ -433,11 +770,11 @@ def cleanup_process_safe(process, job, worker_name):
                         process.kill()
                     try:
                         process.wait(timeout=5)
-                        logger.info(f"{worker_name} process force killed")
+                        logger.info("%s process force killed", worker_name)
                     except:
-                        logger.error(f"{worker_name} could not confirm process kill")
+                        logger.error("%s could not confirm process kill", worker_name)
                 except OSError as e:
-                    logger.error(f"{worker_name} error force killing: {e}")
+                    logger.error("%s error force killing: %s", worker_name, e)
         
         # Additional cleanup for any remaining child processes using OS commands
         try:
@@ -447,7 +784,35 @@ def cleanup_process_safe(process, job, worker_name):
             pass  # Don't let cleanup errors kill the worker
             
     except Exception as cleanup_error:
-        logger.error(f"{worker_name} error during process cleanup: {cleanup_error}")
+        logger.error("%s error during process cleanup: %s", worker_name, cleanup_error)
+
+def find_child_pids(parent_pid):
+    """List the direct children of parent_pid, from /proc where it can be read and pgrep otherwise"""
+    # Our own main thread's children file exists only with /proc mounted and CONFIG_PROC_CHILDREN set
+    if not os.path.exists(f'/proc/self/task/{os.getpid()}/children'):
+        result = subprocess.run(
+            ['pgrep', '-P', str(parent_pid)],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        # Parse the pgrep output once into integer PIDs
+        return [int(pid) for pid in result.stdout.split() if pid.isdigit()] if result.returncode == 0 else []
+
+    try:
+        task_ids = os.listdir(f'/proc/{parent_pid}/task')
+    except FileNotFoundError:
+        return []  # The parent is gone - its children were reparented, so it has none left
+
+    # Each thread of the parent lists the children it forked
+    child_pids = []
+    for task_id in task_ids:
+        try:
+            with open(f'/proc/{parent_pid}/task/{task_id}/children') as children_file:
+                child_pids.extend(int(pid) for pid in children_file.read().split())
+        except FileNotFoundError:
+            pass  # The thread exited after listdir
+    return child_pids
 
 def cleanup_child_processes_os(parent_pid, worker_name):
     """Clean up child processes using OS commands (psutil-free)"""
@@ -457,40 +822,31 @@ def cleanup_child_processes_os(parent_pid, worker_name):
         if system in ['linux', 'darwin']:  # Unix-like systems
             # Find and kill child processes
             try:
-                # Use pgrep to find children
-                result = subprocess.run(
-                    ['pgrep', '-P', str(parent_pid)],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                child_pids = find_child_pids(parent_pid)
                 
-                if result.returncode == 0 and result.stdout.strip():
-                    child_pids = result.stdout.strip().split('\n')
-                    logger.info(f"{worker_name} found {len(child_pids)} child processes to cleanup")
+                if child_pids:
+                    logger.info("%s found %s child processes to cleanup", worker_name, len(child_pids))
                     
                     for child_pid in child_pids:
-                        if child_pid.strip():
-                            try:
-                                os.kill(int(child_pid.strip()), signal.SIGTERM)
-                                logger.debug(f"{worker_name} sent SIGTERM to child {child_pid}")
-                            except (ValueError, OSError):
-                                pass
+                        try:
+                            os.kill(child_pid, signal.SIGTERM)
+                            logger.debug("%s sent SIGTERM to child %s", worker_name, child_pid)
+                        except OSError:
+                            pass
                     
                     # Wait a bit then force kill any remaining
                     time.sleep(2)
                     for child_pid in child_pids:
-                        if child_pid.strip():
-                            try:
-                                os.kill(int(child_pid.strip()), signal.SIGKILL)
-                                logger.debug(f"{worker_name} force killed child {child_pid}")
-                            except (ValueError, OSError):
-                                pass
+                        try:
+                            os.kill(child_pid, signal.SIGKILL)
+                            logger.debug("%s force killed child %s", worker_name, child_pid)
+                        except OSError:
+                            pass
                                 
             except subprocess.TimeoutExpired:
-                logger.warning(f"{worker_name} pgrep timeout during child cleanup")
+                logger.warning("%s pgrep timeout during child cleanup", worker_name)
             except Exception as e:
-                logger.debug(f"{worker_name} child cleanup error: {e}")
+                logger.debug("%s child cleanup error: %s", worker_name, e)
                 
         elif system == 'windows':
             # Windows cleanup using taskkill
@@ -504,29 +860,53 @@ def cleanup_child_processes_os(parent_pid, worker_name):
                 pass  # Windows cleanup is optional
                 
     except Exception as e:
-        logger.debug(f"{worker_name} OS-specific cleanup error: {e}")
+        logger.debug("%s OS-specific cleanup error: %s", worker_name, e)
+
+def prebuild_zisk_program():
+    """Build the ZisK guest program once at startup - proof jobs then skip the build step"""
+    # Hold the execution lock so no proof job races the build for cargo's target directory
+    with zisk_execution_lock:
+        logger.info("Building ZisK program (cargo-zisk build --release)...")
+        try:
+            result = subprocess.run(
+                ['cargo-zisk', 'build', '--release'],
+                capture_output=True,
+                text=True,
+                cwd=ZISK_PROJECT_DIR,
+                timeout=1800
+            )
+            
+            if result.returncode == 0:
+                logger.info("ZisK program built - proof jobs will reuse it")
+            else:
+                logger.warning(f"ZisK program build failed (exit code {result.returncode}), proof jobs will retry: {result.stderr}")
+        except FileNotFoundError:
+            logger.warning("cargo-zisk not found - the first proof job will build the ZisK program")
+        except subprocess.TimeoutExpired:
+            logger.warning("ZisK program build timed out - the first proof job will build it")
+        except Exception as e:
+            logger.error(f"ZisK program build error: {e}")
 
 # Worker health monitoring
 def monitor_workers():
     """Monitor worker health and restart if needed"""
-    while True:
+    # Check every minute until shutdown
+    while not shutdown_event.wait(60):
         try:
-            time.sleep(60)  # Check every minute
-            
             # Clean up old deduplication entries
             cleanup_old_dedup_entries()
             
             with proof_jobs_lock:
-                # Check if we have jobs but no active workers
-                if proof_queue.qsize() > 0 and len(active_proof_workers) == 0:
-                    logger.warning("Jobs in queue but no active workers - restarting workers")
-                    init_proof_workers(num_workers=2)
+                # Check if we have jobs but no live workers (idle workers block in get() and count as live)
+                if proof_queue.qsize() > 0 and not any(t.is_alive() for t in worker_threads):
+                    logger.warning("Jobs in queue but no live workers - restarting workers")
+                    init_proof_workers(num_workers=PROOF_WORKER_COUNT)
                 
                 # Log worker status
                 if active_proof_workers:
                     logger.info(f"Active workers: {len(active_proof_workers)}")
                     for thread_id, job in active_proof_workers.items():
-                        duration = (datetime.now() - job.started_at).total_seconds()
+                        duration = time.time() - job.started_at
                         logger.info(f"  Worker {thread_id}: job {job.job_id} running {duration:.0f}s")
             
         except Exception as e:
@@ -537,42 +917,52 @@ worker_threads = []
 
 def update_leaderboard_with_real_proof(job):
     """Update leaderboard entry with REAL proof completion status"""
+    entry = job.leaderboard_entry  # Direct reference - no scan of the leaderboard
+    if entry is None:
+        return  # Never made the board
+    
     try:
         with leaderboard_lock:
-            difficulty_scores = leaderboard[job.difficulty]
+            # Checked under the lock - a concurrent submission can evict the entry at any point before it
+            if entry.get('evicted'):
+                return  # Has fallen off the board (and out of the store) since it was recorded
+            
+            entry['proof_status'] = job.status.value
+            entry['proof_completed_at'] = isoformat_timestamp(job.completed_at)
+            
+            if job.proof_file_path:
+                entry['proof_file_path'] = job.proof_file_path
+            
+            if job.error_message:
+                entry['proof_error'] = job.error_message
+            
+            leaderboard_views.pop(job.job_id, None)  # Rebuilt with the new status on next read
+            invalidate_leaderboard_responses(job.difficulty)
+            save_leaderboard_entry(entry)
+            
+            logger.info(f"Updated leaderboard entry with REAL proof result for job {job.job_id}")
             
-            # Find and update the corresponding leaderboard entry
-            for entry in difficulty_scores:
-                if (entry.get('player_id') == job.player_id and 
-                    entry.get('score') == job.score and
-                    entry.get('job_id') == job.job_id):
-                    
-                    entry['proof_status'] = job.status.value
-                    entry['proof_completed_at'] = job.completed_at.isoformat() if job.completed_at else None
-                    
-                    if job.proof_file_path:
-                        entry['proof_file_path'] = job.proof_file_path
-                    
-                    if job.error_message:
-                        entry['proof_error'] = job.error_message
-                    
-                    logger.info(f"Updated leaderboard entry with REAL proof result for job {job.job_id}")
-                    break
-                    
     except Exception as e:
         logger.error(f"Error updating leaderboard for job {job.job_id}: {e}")
 
+# Pre-encoded body of the idle /api/system-status answer, open at the timestamp value
+SYSTEM_READY_RESPONSE_PREFIX = json.dumps({
+    'ready_for_submissions': True,
+    'system_busy': False,
+    'message': 'System is ready for new score submissions',
+    'active_jobs': 0
+})[:-1].encode() + b', "timestamp": "'
+
 @app.route('/api/system-status', methods=['GET'])
 def system_status():
     """Check if system is ready for new submissions"""
     with proof_jobs_lock:
-        active_jobs = [job for job in proof_jobs.values() 
-                      if job.status in [ProofStatus.PENDING, ProofStatus.IN_PROGRESS]]
+        active_jobs = list(active_proof_jobs.values())  # Maintained by set_job_status - no scan of job history
         system_busy = len(active_jobs) > 0
         
         if system_busy:
-            oldest_job = min(active_jobs, key=lambda x: x.created_at)
-            elapsed_time = (datetime.now() - oldest_job.created_at).total_seconds()
+            oldest_job = active_jobs[0]  # active_proof_jobs is in creation order
+            elapsed_time = time.time() - oldest_job.created_at
             return jsonify({
                 'ready_for_submissions': False,
                 'system_busy': True,
@@ -583,14 +973,11 @@ def system_status():
                 'estimated_wait': '5-15 minutes',
                 'timestamp': datetime.now().isoformat()
             }), 503
-        else:
-            return jsonify({
-                'ready_for_submissions': True,
-                'system_busy': False,
-                'message': 'System is ready for new score submissions',
-                'active_jobs': 0,
-                'timestamp': datetime.now().isoformat()
-            })
+    # Idle answer is pre-encoded; only the timestamp is filled in per request
+    return app.response_class(
+        SYSTEM_READY_RESPONSE_PREFIX + datetime.now().isoformat().encode() + b'"}',
+        mimetype='application/json'
+    )
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -600,23 +987,23 @@ def health_check():
         pending_count = proof_queue.qsize()
         
         total_jobs = len(proof_jobs)
-        completed_jobs = len([j for j in proof_jobs.values() if j.status == ProofStatus.COMPLETED])
-        failed_jobs = len([j for j in proof_jobs.values() if j.status == ProofStatus.FAILED])
+        completed_jobs = proof_status_counts[ProofStatus.COMPLETED]
+        failed_jobs = proof_status_counts[ProofStatus.FAILED]
         
         # SYSTEM BUSY STATUS CHECK
-        active_jobs = [job for job in proof_jobs.values() 
-                      if job.status in [ProofStatus.PENDING, ProofStatus.IN_PROGRESS]]
+        active_jobs = list(active_proof_jobs.values())  # Maintained by set_job_status - no scan of job history
         system_busy = len(active_jobs) > 0
         
         if system_busy:
-            oldest_job = min(active_jobs, key=lambda x: x.created_at)
-            elapsed_time = (datetime.now() - oldest_job.created_at).total_seconds()
+            oldest_job = active_jobs[0]  # active_proof_jobs is in creation order
+            elapsed_time = time.time() - oldest_job.created_at
         else:
             oldest_job = None
             elapsed_time = 0
     
     with leaderboard_lock:
-        total_scores = sum(len(scores) for scores in leaderboard.values())
+        total_scores = leaderboard_total_scores
+        difficulty_levels = list(leaderboard.keys())  # Snapshot - a submit may add a difficulty concurrently
     
     return jsonify({
         'status': 'healthy',
@@ -637,7 +1024,7 @@ def health_check():
         },
         'leaderboard': {
             'total_real_scores': total_scores,  # Only real submitted scores
-            'difficulty_levels': list(leaderboard.keys())
+            'difficulty_levels': difficulty_levels
         }
     })
 
@@ -647,15 +1034,14 @@ def submit_score():
     try:
         # GLOBAL EXECUTION LOCK CHECK - PREVENT NEW SUBMISSIONS WHILE ZISK IS RUNNING
         with proof_jobs_lock:
-            active_jobs = [job for job in proof_jobs.values() 
-                          if job.status in [ProofStatus.PENDING, ProofStatus.IN_PROGRESS]]
+            active_jobs = list(active_proof_jobs.values())  # Maintained by set_job_status - no scan of job history
             
             if active_jobs:
                 # 🚫 SYSTEM IS BUSY - ZISK PROOF GENERATION IN PROGRESS
-                oldest_job = min(active_jobs, key=lambda x: x.created_at)
-                elapsed_time = (datetime.now() - oldest_job.created_at).total_seconds()
+                oldest_job = active_jobs[0]  # active_proof_jobs is in creation order
+                elapsed_time = time.time() - oldest_job.created_at
                 
-                logger.warning(f"🚫 SYSTEM BUSY: ZisK proof generation in progress. {len(active_jobs)} active jobs. Oldest job running for {elapsed_time:.1f}s")
+                logger.warning("🚫 SYSTEM BUSY: ZisK proof generation in progress. %s active jobs. Oldest job running for %.1fs", len(active_jobs), elapsed_time)
                 
                 return jsonify({
                     'success': False,
@@ -680,39 +1066,63 @@ def submit_score():
         difficulty = data.get('difficulty', 1)
         request_id = data.get('request_id')  # Optional client-provided request ID
         
-        logger.info(f"REAL score submission: Player {player_id}, Score {score}, Difficulty {difficulty}, Request ID: {request_id}")
+        # Validate before the values are used as dedup/leaderboard keys
+        if not isinstance(player_id, str) or not player_id:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid player_id - must be a non-empty string'
+            }), 400
+        
+        # Scores are whole pipe counts - floats (including NaN/inf) and booleans are rejected, and the
+        # range matches the guest program so nothing reaches the leaderboard that can't be proven
+        if not isinstance(score, int) or isinstance(score, bool) or not MIN_SCORE <= score <= MAX_SCORE:
+            return jsonify({
+                'success': False, 
+                'error': f'Invalid score value - must be an integer from {MIN_SCORE} to {MAX_SCORE}'
+            }), 400
+        
+        # The request_id index is a dict - only strings are accepted as keys
+        if request_id is not None and not isinstance(request_id, str):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request_id - must be a string when given'
+            }), 400
+        
+        # Difficulty keys the dedup table and the leaderboard - only the known integer levels
+        if type(difficulty) is not int or difficulty not in DIFFICULTY_LEVELS:  # type() check also rejects bools and 1.0
+            return jsonify({
+                'success': False,
+                'error': f'Invalid difficulty - must be one of {list(DIFFICULTY_LEVELS)}'
+            }), 400
+        
+        logger.info("REAL score submission: Player %s, Score %s, Difficulty %s, Request ID: %s", player_id, score, difficulty, request_id)
         
         # BULLETPROOF DEDUPLICATION CHECK - MULTIPLE LEVELS
         
         # Level 1: Check by score+player+difficulty (time window)
         dedup_key = (player_id, score, difficulty)
-        current_time = datetime.now()
+        current_time = time.monotonic()  # Dedup window clock - wall-clock jumps can't stretch or skip the window
         
-        with dedup_lock:
-            if dedup_key in recent_submissions:
-                last_submission = recent_submissions[dedup_key]
-                time_diff = (current_time - last_submission['timestamp']).total_seconds()
+        # Lock-free probe first - the lock is only taken when there is an entry to judge or evict
+        if dedup_key in recent_submissions:
+            with dedup_lock:
+                last_submission = recent_submissions.get(dedup_key)  # Re-check - the sweep may have evicted it
+                time_diff = current_time - last_submission['timestamp'] if last_submission else DEDUP_WINDOW_SECONDS
                 
                 if time_diff < DEDUP_WINDOW_SECONDS:
                     # 🚫 BLOCK DUPLICATE SUBMISSION
-                    wait_time = DEDUP_WINDOW_SECONDS - time_diff
-                    logger.warning(f"🚫 DUPLICATE BLOCKED: Player {player_id}, Score {score} within {time_diff:.1f}s (wait {wait_time:.1f}s)")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Duplicate submission blocked. Same score submitted {time_diff:.1f}s ago. Wait {wait_time:.1f}s.',
-                        'blocked': True,
-                        'existing_job_id': last_submission['job_id'],
-                        'time_remaining': wait_time
-                    }), 429  # Too Many Requests
+                    return duplicate_submission_response(player_id, score, last_submission, time_diff)
+                
+                if last_submission:
+                    del recent_submissions[dedup_key]  # Expired - evict now rather than at the next sweep
         
         # Level 2: Check by request_id if provided (most robust)
         if request_id:
             with proof_jobs_lock:
-                existing_job = next((job for job in proof_jobs.values() 
-                                   if hasattr(job, 'request_id') and job.request_id == request_id), None)
+                existing_job = proof_jobs_by_request_id.get(request_id)  # O(1) - no scan of every job under the lock
                 
                 if existing_job:
-                    logger.warning(f"🚫 REQUEST ID DUPLICATE: Request {request_id} already processed as job {existing_job.job_id}")
+                    logger.warning("🚫 REQUEST ID DUPLICATE: Request %s already processed as job %s", request_id, existing_job.job_id)
                     return jsonify({
                         'success': True,
                         'message': 'Request already processed',
@@ -722,53 +1132,48 @@ def submit_score():
                         'existing_job': existing_job.to_dict()
                     })
         
-        # Validate score - must be a positive number
-        if not isinstance(score, (int, float)) or score < 0:
-            return jsonify({
-                'success': False, 
-                'error': 'Invalid score value - must be a positive number'
-            }), 400
-        
         # Create REAL proof job
-        job_id = str(uuid.uuid4())
+        job_uuid = uuid.uuid4()
+        job_id = job_uuid.hex
         job = ProofJob(job_id, player_id, score, difficulty, request_id)
         
-        with proof_jobs_lock:
-            proof_jobs[job_id] = job
-        
-        # Generate Game ID for tamper-proof binding
-        job.game_id = generate_game_id(job_id, score)
+        # Generate Game ID for tamper-proof binding - before the job is visible to status readers
+        job.game_id = generate_game_id(job_uuid, score, job.created_at)
         
-        # RECORD THIS SUBMISSION FOR DEDUPLICATION
+        # RECORD THIS SUBMISSION FOR DEDUPLICATION - check and record in one critical section: the
+        # probe above ran without the lock, so two identical submissions can both get this far
         with dedup_lock:
-            recent_submissions[dedup_key] = {
+            last_submission = recent_submissions.get(dedup_key)
+            if last_submission is not None:
+                time_diff = current_time - last_submission['timestamp']
+                if time_diff < DEDUP_WINDOW_SECONDS:
+                    return duplicate_submission_response(player_id, score, last_submission, time_diff)
+            
+            record_submission(dedup_key, {
                 'timestamp': current_time,
                 'job_id': job_id,
                 'request_id': request_id
-            }
-        
-        # Add REAL score to leaderboard immediately with pending proof status
-        score_entry = {
-            'job_id': job_id,
-            'player_id': player_id,
-            'score': score,
-            'difficulty': difficulty,
-            'game_id': job.game_id,
-            'timestamp': datetime.now().isoformat(),
-            'proof_status': ProofStatus.PENDING.value,
-            'proof_file_path': None
-        }
+            })
         
-        with leaderboard_lock:
-            leaderboard[difficulty].append(score_entry)
-            leaderboard[difficulty].sort(key=lambda x: x['score'], reverse=True)
-            # Keep top 1000 scores per difficulty
-            leaderboard[difficulty] = leaderboard[difficulty][:1000]
+        try:
+            # Add REAL score to leaderboard immediately with pending proof status - before the job is
+            # registered, so a failure here leaves no job that never gets queued (it would block every
+            # later submission)
+            leaderboard_position = record_leaderboard_score(job)
+            
+            with proof_jobs_lock:
+                add_proof_job(job)
+        except Exception:
+            # Give the dedup slot back - this submission never happened
+            with dedup_lock:
+                if recent_submissions.get(dedup_key, {}).get('job_id') == job_id:
+                    del recent_submissions[dedup_key]
+            raise
         
         # Queue REAL proof job
         proof_queue.put(job)
         
-        logger.info(f"✅ REAL proof job {job_id} queued successfully with game_id: {job.game_id}, request_id: {request_id}")
+        logger.info("✅ REAL proof job %s queued successfully with game_id: %s, request_id: %s", job_id, job.game_id, request_id)
         
         return jsonify({
             'success': True,
@@ -776,10 +1181,11 @@ def submit_score():
             'job_id': job_id,
             'game_id': job.game_id,
             'request_id': request_id,
-            'score_data': score_entry,
+            'leaderboard_position': leaderboard_position,
             'proof_status': ProofStatus.PENDING.value,
+            'status_url': f'/api/proof-status/{job_id}',
             'estimated_time': '20-45 minutes'
-        })
+        }), 202, {'Location': f'/api/proof-status/{job_id}'}  # Accepted - poll status_url for the proof
         
     except Exception as e:
         logger.error(f"Error in REAL score submission: {str(e)}")
@@ -789,29 +1195,71 @@ def submit_score():
 def get_proof_status(job_id):
     """Get the status of a REAL proof job"""
     try:
-        with proof_jobs_lock:
-            if job_id not in proof_jobs:
-                return jsonify({
-                    'success': False, 
-                    'error': f'Proof job {job_id} not found'
-                }), 404
-            
-            job = proof_jobs[job_id]
+        job = proof_jobs.get(job_id)  # Single dict lookup - atomic, jobs are never removed
+        if job is None:
             return jsonify({
-                'success': True,
-                'job': job.to_dict()
-            })
+                'success': False, 
+                'error': f'Proof job {job_id} not found'
+            }), 404
+        
+        # The lock only covers building the view, so it is never cached mid-transition
+        with proof_jobs_lock:
+            job_data = job.to_dict()
             
+            # Raw ZisK script output is large - only send it when explicitly asked for
+            if request.args.get('debug') == '1':
+                job_data = dict(job_data, proof_output=job.proof_output)  # Copy - the to_dict() view is shared
+        
+        return jsonify({
+            'success': True,
+            'job': job_data
+        })
+        
     except Exception as e:
         logger.error(f"Error getting proof status: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/proof-log/<job_id>', methods=['GET'])
+def get_proof_log(job_id):
+    """Get the full ZisK script output of a proof job"""
+    try:
+        job = proof_jobs.get(job_id)  # Single dict lookup - atomic, jobs are never removed
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': f'Proof job {job_id} not found'
+            }), 404
+        
+        log_path = job.proof_log_path
+        if not log_path or not os.path.exists(log_path):
+            return jsonify({
+                'success': False,
+                'error': f'No proof log for job {job_id} - the ZisK script has not run for it, or its log has been rotated out'
+            }), 404
+        
+        return send_file(log_path, mimetype='text/plain')
+        
+    except Exception as e:
+        logger.error(f"Error getting proof log: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/proof-jobs', methods=['GET'])
 def get_proof_jobs():
     """Get all REAL proof jobs with optional filtering"""
     try:
         status_filter = request.args.get('status')
-        limit = request.args.get('limit', 100, type=int)
+        limit = max(0, request.args.get('limit', 100, type=int))
+        
+        # Resolve the filter to its enum member once; the scan then compares by identity
+        status_enum = None
+        if status_filter:
+            try:
+                status_enum = ProofStatus(status_filter)
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': f'No proof jobs found with status: {status_filter}'
+                }), 404
         
         with proof_jobs_lock:
             if not proof_jobs:
@@ -820,26 +1268,33 @@ def get_proof_jobs():
                     'error': 'No proof jobs found - no real scores have been submitted yet'
                 }), 404
             
-            jobs = list(proof_jobs.values())
+            # Newest first - proof_jobs is already in creation order, so no sort is needed
+            newest_first = reversed(proof_jobs.values())
             
             if status_filter:
-                jobs = [j for j in jobs if j.status.value == status_filter]
+                # Stop scanning once `limit` matches are found (at least one, to tell "none" from limit=0)
+                matching = (j for j in newest_first if j.status is status_enum)
+                jobs = list(itertools.islice(matching, max(limit, 1)))
                 if not jobs:
                     return jsonify({
                         'success': False,
                         'error': f'No proof jobs found with status: {status_filter}'
                     }), 404
+                jobs = jobs[:limit]
+            else:
+                # Only the first `limit` jobs are touched, however long the job history is
+                jobs = list(itertools.islice(newest_first, limit))
             
-            # Sort by creation time (newest first)
-            jobs.sort(key=lambda x: x.created_at, reverse=True)
-            jobs = jobs[:limit]
-            
-            return jsonify({
-                'success': True,
-                'jobs': [job.to_dict() for job in jobs],
-                'total_jobs': len(proof_jobs)
-            })
-            
+            job_views = [job.to_dict() for job in jobs]
+            total_jobs = len(proof_jobs)
+        
+        # Encode outside the lock - workers and status polls don't wait on serialization
+        return jsonify({
+            'success': True,
+            'jobs': job_views,
+            'total_jobs': total_jobs
+        })
+        
     except Exception as e:
         logger.error(f"Error getting proof jobs: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -848,27 +1303,35 @@ def get_proof_jobs():
 def get_leaderboard(difficulty):
     """Get leaderboard for a specific difficulty level - ONLY REAL SCORES"""
     try:
-        with leaderboard_lock:
-            if difficulty not in leaderboard or not leaderboard[difficulty]:
-                return jsonify({
-                    'success': False,
-                    'error': f'No real scores found for difficulty level {difficulty}'
-                }), 404
-            
-            difficulty_scores = leaderboard[difficulty].copy()
-        
-        # Sort by score (descending)
-        difficulty_scores.sort(key=lambda x: x['score'], reverse=True)
+        # Cached bodies are immutable bytes that writers only drop, never edit - read them without the lock
+        cached = leaderboard_response_cache.get(difficulty)
         
-        # Limit to top 100 scores
-        top_scores = difficulty_scores[:100]
+        if cached is None:
+            with leaderboard_lock:
+                cached = leaderboard_response_cache.get(difficulty)  # Another request may have just built it
+                
+                if cached is None:
+                    difficulty_scores = leaderboard.get(difficulty)
+                    if not difficulty_scores:
+                        return jsonify({
+                            'success': False,
+                            'error': f'No real scores found for difficulty level {difficulty}'
+                        }), 404
+                    
+                    # Top 100 scores - the list is kept sorted best-first by insert_leaderboard_entry
+                    top_scores = [project_leaderboard_entry(entry) for entry in difficulty_scores[:100]]
+                    
+                    # Serialized once per change to this difficulty; repeat polls reuse the bytes
+                    body = app.json.dumps({
+                        'success': True,
+                        'difficulty': difficulty,
+                        'scores': top_scores,
+                        'total_scores': len(difficulty_scores)
+                    }).encode()
+                    cached = (body, hashlib.sha1(body).hexdigest())
+                    leaderboard_response_cache[difficulty] = cached
         
-        return jsonify({
-            'success': True,
-            'difficulty': difficulty,
-            'scores': top_scores,
-            'total_scores': len(difficulty_scores)
-        })
+        return cached_json_response(cached)
         
     except Exception as e:
         logger.error(f"Error getting leaderboard: {str(e)}")
@@ -878,30 +1341,35 @@ def get_leaderboard(difficulty):
 def get_all_leaderboards():
     """Get all leaderboards - ONLY REAL SCORES"""
     try:
-        with leaderboard_lock:
-            if not leaderboard:
-                return jsonify({
-                    'success': False,
-                    'error': 'No real scores found - no scores have been submitted yet'
-                }), 404
-            
-            all_leaderboards = {}
-            for difficulty, scores in leaderboard.items():
-                if scores:  # Only include difficulties that have real scores
-                    sorted_scores = sorted(scores, key=lambda x: x['score'], reverse=True)
-                    all_leaderboards[difficulty] = sorted_scores[:100]  # Top 100
+        # Same lock-free cached-bytes path as the per-difficulty endpoint; any leaderboard write drops it
+        cached = leaderboard_response_cache.get(ALL_LEADERBOARDS_CACHE_KEY)
         
-        if not all_leaderboards:
-            return jsonify({
-                'success': False,
-                'error': 'No real scores found in any difficulty level'
-            }), 404
+        if cached is None:
+            with leaderboard_lock:
+                cached = leaderboard_response_cache.get(ALL_LEADERBOARDS_CACHE_KEY)
+                
+                if cached is None:
+                    all_leaderboards = {}
+                    for difficulty, scores in leaderboard.items():
+                        if scores:  # Only include difficulties that have real scores
+                            # Top 100 - already sorted best-first by insert_leaderboard_entry
+                            all_leaderboards[difficulty] = [project_leaderboard_entry(entry) for entry in scores[:100]]
+                    
+                    if not all_leaderboards:
+                        return jsonify({
+                            'success': False,
+                            'error': 'No real scores found - no scores have been submitted yet'
+                        }), 404
+                    
+                    body = app.json.dumps({
+                        'success': True,
+                        'leaderboards': all_leaderboards,
+                        'difficulty_levels': list(all_leaderboards.keys())
+                    }).encode()
+                    cached = (body, hashlib.sha1(body).hexdigest())
+                    leaderboard_response_cache[ALL_LEADERBOARDS_CACHE_KEY] = cached
         
-        return jsonify({
-            'success': True,
-            'leaderboards': all_leaderboards,
-            'difficulty_levels': list(all_leaderboards.keys())
-        })
+        return cached_json_response(cached)
         
     except Exception as e:
         logger.error(f"Error getting all leaderboards: {str(e)}")
@@ -927,11 +1395,11 @@ def get_stats():
             else:
                 proof_stats = {
                     'total_jobs': len(proof_jobs),
-                    'pending': len([j for j in proof_jobs.values() if j.status == ProofStatus.PENDING]),
-                    'in_progress': len([j for j in proof_jobs.values() if j.status == ProofStatus.IN_PROGRESS]),
-                    'completed': len([j for j in proof_jobs.values() if j.status == ProofStatus.COMPLETED]),
-                    'failed': len([j for j in proof_jobs.values() if j.status == ProofStatus.FAILED]),
-                    'timeout': len([j for j in proof_jobs.values() if j.status == ProofStatus.TIMEOUT]),
+                    'pending': proof_status_counts[ProofStatus.PENDING],
+                    'in_progress': proof_status_counts[ProofStatus.IN_PROGRESS],
+                    'completed': proof_status_counts[ProofStatus.COMPLETED],
+                    'failed': proof_status_counts[ProofStatus.FAILED],
+                    'timeout': proof_status_counts[ProofStatus.TIMEOUT],
                     'active_workers': len(active_proof_workers),
                     'queue_size': proof_queue.qsize()
                 }
@@ -970,23 +1438,27 @@ def get_stats():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Initialize proof worker threads
-def init_proof_workers(num_workers=2):
+def init_proof_workers(num_workers=PROOF_WORKER_COUNT):
     """Initialize bulletproof proof worker threads for REAL proof generation"""
     global worker_threads
     
     # Force cleanup of ALL old workers to prevent hanging
     logger.info("🧹 Cleaning up ALL old worker threads...")
+    stopping_workers = []
     for worker in worker_threads:
         try:
             if worker.is_alive():
                 logger.info(f"Terminating old worker: {worker.name}")
                 # Send poison pill to stop worker gracefully
                 proof_queue.put(None)
+                stopping_workers.append(worker)
         except:
             pass
     
-    # Wait a bit for workers to terminate
-    time.sleep(2)
+    # Wait up to 2s in total for the signalled workers - returns at once when there were none
+    stop_deadline = time.time() + 2
+    for worker in stopping_workers:
+        worker.join(timeout=max(0, stop_deadline - time.time()))
     
     # Clean up any dead threads
     worker_threads = [t for t in worker_threads if t.is_alive()]
@@ -1000,7 +1472,7 @@ def init_proof_workers(num_workers=2):
         for i in range(workers_needed):
             worker = threading.Thread(
                 target=proof_worker, 
-                daemon=False,  # NOT daemon - we want them to stay alive
+                daemon=True,  # Idle workers block in proof_queue.get() - non-daemon ones would keep the process (and atexit) from ever finishing
                 name=f"ProofWorker-{len(worker_threads) + i + 1}"
             )
             worker.start()
@@ -1020,28 +1492,28 @@ def get_worker_status():
         dead_count = len(worker_threads) - len(alive_threads)
         worker_threads = alive_threads
         
-        with proof_jobs_lock:
-            worker_details = []
-            for thread in worker_threads:
-                thread_id = thread.ident
-                worker_info = {
-                    'thread_name': thread.name,
-                    'thread_id': thread_id,
-                    'is_alive': thread.is_alive(),
-                    'current_job': None
+        # No lock - each dict lookup is atomic, and a worker publishes its job only after setting started_at
+        worker_details = []
+        for thread in worker_threads:
+            thread_id = thread.ident
+            worker_info = {
+                'thread_name': thread.name,
+                'thread_id': thread_id,
+                'is_alive': thread.is_alive(),
+                'current_job': None
+            }
+            
+            job = active_proof_workers.get(thread_id)
+            if job is not None:
+                worker_info['current_job'] = {
+                    'job_id': job.job_id,
+                    'player_id': job.player_id,
+                    'score': job.score,
+                    'started_at': isoformat_timestamp(job.started_at),
+                    'duration_seconds': time.time() - job.started_at
                 }
-                
-                if thread_id in active_proof_workers:
-                    job = active_proof_workers[thread_id]
-                    worker_info['current_job'] = {
-                        'job_id': job.job_id,
-                        'player_id': job.player_id,
-                        'score': job.score,
-                        'started_at': job.started_at.isoformat(),
-                        'duration_seconds': (datetime.now() - job.started_at).total_seconds()
-                    }
-                
-                worker_details.append(worker_info)
+            
+            worker_details.append(worker_info)
         
         return jsonify({
             'success': True,
@@ -1064,35 +1536,41 @@ def get_worker_status():
 def download_proof(job_id):
     """Download the generated proof file for a completed job"""
     try:
+        job = proof_jobs.get(job_id)  # Single dict lookup - atomic, jobs are never removed
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': f'Proof job {job_id} not found'
+            }), 404
+        
         with proof_jobs_lock:
-            if job_id not in proof_jobs:
-                return jsonify({
-                    'success': False,
-                    'error': f'Proof job {job_id} not found'
-                }), 404
-            
-            job = proof_jobs[job_id]
-            
-            if job.status != ProofStatus.COMPLETED:
-                return jsonify({
-                    'success': False,
-                    'error': f'Proof job {job_id} is not completed (status: {job.status.value})'
-                }), 400
-            
-            if not job.proof_file_path or not os.path.exists(job.proof_file_path):
-                return jsonify({
-                    'success': False,
-                    'error': f'Proof file not found at {job.proof_file_path}'
-                }), 404
-            
-            # Return the proof file
-            return send_file(
-                job.proof_file_path,
-                as_attachment=True,
-                download_name=f'zisk_proof_score_{job.score}.bin',
-                mimetype='application/octet-stream'
-            )
-            
+            status = job.status
+            proof_file_path = job.proof_file_path
+        
+        if status != ProofStatus.COMPLETED:
+            return jsonify({
+                'success': False,
+                'error': f'Proof job {job_id} is not completed (status: {status.value})'
+            }), 400
+        
+        # The send happens outside the lock. send_file stats the file itself, so a missing file
+        # (e.g. removed from the shared proof directory since) surfaces here instead of costing a separate exists() check
+        try:
+            if proof_file_path:
+                return send_file(
+                    proof_file_path,
+                    as_attachment=True,
+                    download_name=f'zisk_proof_score_{job.score}.bin',
+                    mimetype='application/octet-stream'
+                )
+        except FileNotFoundError:
+            pass
+        
+        return jsonify({
+            'success': False,
+            'error': f'Proof file not found at {proof_file_path}'
+        }), 404
+        
     except Exception as e:
         logger.error(f"Error downloading proof file: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1102,20 +1580,23 @@ def get_dedup_status():
     """Get current deduplication status for debugging"""
     try:
         with dedup_lock:
-            current_time = datetime.now()
+            current_time = time.monotonic()
+            wall_clock_offset = time.time() - current_time  # Maps monotonic dedup stamps back to wall time for display
             active_entries = {}
             
-            for (player_id, score, difficulty), data in recent_submissions.items():
-                time_diff = (current_time - data['timestamp']).total_seconds()
-                if time_diff < DEDUP_WINDOW_SECONDS:
-                    active_entries[f"{player_id}_{score}_{difficulty}"] = {
-                        'player_id': player_id,
-                        'score': score,
-                        'difficulty': difficulty,
-                        'submitted_at': data['timestamp'].isoformat(),
-                        'seconds_ago': time_diff,
-                        'remaining_block': DEDUP_WINDOW_SECONDS - time_diff
-                    }
+            # Newest first - everything after the first expired entry is older, so stop there
+            for (player_id, score, difficulty), data in reversed(recent_submissions.items()):
+                time_diff = current_time - data['timestamp']
+                if time_diff >= DEDUP_WINDOW_SECONDS:
+                    break
+                active_entries[f"{player_id}_{score}_{difficulty}"] = {
+                    'player_id': player_id,
+                    'score': score,
+                    'difficulty': difficulty,
+                    'submitted_at': isoformat_timestamp(data['timestamp'] + wall_clock_offset),
+                    'seconds_ago': time_diff,
+                    'remaining_block': DEDUP_WINDOW_SECONDS - time_diff
+                }
             
             return jsonify({
                 'success': True,
@@ -1141,12 +1622,12 @@ def test_dedup():
         
         # Check if this submission would be blocked
         dedup_key = (test_player, test_score, test_difficulty)
-        current_time = datetime.now()
+        current_time = time.monotonic()
         
         with dedup_lock:
             if dedup_key in recent_submissions:
                 last_submission = recent_submissions[dedup_key]
-                time_diff = (current_time - last_submission['timestamp']).total_seconds()
+                time_diff = current_time - last_submission['timestamp']
                 
                 return jsonify({
                     'success': True,
@@ -1176,11 +1657,11 @@ def submit_score_internal(player_id, score, difficulty):
         # BULLETPROOF DUPLICATE PREVENTION
         with dedup_lock:
             dedup_key = (player_id, score, difficulty)
-            current_time = datetime.now()
+            current_time = time.monotonic()
             
             if dedup_key in recent_submissions:
                 last_submission = recent_submissions[dedup_key]
-                time_diff = (current_time - last_submission['timestamp']).total_seconds()
+                time_diff = current_time - last_submission['timestamp']
                 
                 if time_diff < DEDUP_WINDOW_SECONDS:
                     wait_time = DEDUP_WINDOW_SECONDS - time_diff
@@ -1193,7 +1674,7 @@ def submit_score_internal(player_id, score, difficulty):
                     }
             
             # Record this submission
-            recent_submissions[dedup_key] = {'timestamp': current_time, 'job_id': str(uuid.uuid4())} # Store job_id for dedup
+            record_submission(dedup_key, {'timestamp': current_time, 'job_id': uuid.uuid4().hex}) # Store job_id for dedup
         
         return {
             'success': True,
@@ -1208,7 +1689,10 @@ def submit_score_internal(player_id, score, difficulty):
 def cleanup_workers_on_shutdown():
     """Clean up all worker threads on shutdown"""
     global worker_threads
+    if shutdown_event.is_set():
+        return  # Already ran - the __main__ block and atexit can both get here
     logger.info("🛑 Shutting down all worker threads...")
+    shutdown_event.set()
     
     # Send poison pills to all workers
     for _ in range(len(worker_threads)):
@@ -1217,11 +1701,12 @@ def cleanup_workers_on_shutdown():
         except:
             pass
     
-    # Wait for workers to terminate
+    # Wait for workers to terminate - all of them share one 5s deadline rather than 5s each
+    stop_deadline = time.monotonic() + 5
     for worker in worker_threads:
         try:
             if worker.is_alive():
-                worker.join(timeout=5)
+                worker.join(timeout=max(0, stop_deadline - time.monotonic()))
                 if worker.is_alive():
                     logger.warning(f"Worker {worker.name} did not terminate gracefully")
         except:
@@ -1259,30 +1744,74 @@ def restart_workers():
         logger.error(f"Error restarting workers: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-if __name__ == '__main__':
-    logger.info("Starting REAL ZisK Proof API - NO FAKE DATA")
-    logger.info("System will ONLY process real submitted scores")
-    logger.info("All mock/fake implementations have been REMOVED")
-    logger.info("Enhanced with bulletproof worker system and psutil-free process management")
-    logger.info("BULLETPROOF DUPLICATE PREVENTION ENABLED - 30 second window")
+# Background services (prebuild, proof workers, monitor) are started once per process
+background_services_started = False
+background_services_lock = threading.Lock()
+
+def start_background_services():
+    """Start the ZisK prebuild, proof workers and worker monitor (idempotent)"""
+    global background_services_started
+    
+    with background_services_lock:
+        if background_services_started:
+            return
+        background_services_started = True
+    
+    # Reload persisted scores before accepting new ones
+    if LEADERBOARD_DB_PATH:
+        init_leaderboard_db(LEADERBOARD_DB_PATH)
+    
+    # Proof logs belong to jobs that only existed in the previous run's memory
+    removed = remove_stale_files(PROOF_LOG_DIR)
+    if removed:
+        logger.info(f"🧹 Removed {removed} proof logs left by a previous run")
     
     # Register shutdown handler
     import atexit
     atexit.register(cleanup_workers_on_shutdown)
     
+    # Build the ZisK program once in the background; jobs wait on the execution lock until it is done
+    threading.Thread(target=prebuild_zisk_program, daemon=True, name="ZisKPrebuild").start()
+    
     # Start proof worker threads for REAL proof generation
-    init_proof_workers(num_workers=2)
+    init_proof_workers(num_workers=PROOF_WORKER_COUNT)
     
     # Start worker monitoring in background
     monitor_thread = threading.Thread(target=monitor_workers, daemon=True)
     monitor_thread.start()
     logger.info("Worker monitoring started")
+
+def create_app():
+    """App factory for external servers, e.g. gunicorn 'api_server:create_app()'
+
+    The workers are stopped by the atexit hook, so the server has to end the process with a normal
+    interpreter exit (gunicorn workers do on SIGTERM). Call it in the serving process - not before a
+    fork such as gunicorn --preload, which would leave the worker threads behind in the parent.
+    """
+    start_background_services()
+    return app
+
+if __name__ == '__main__':
+    logger.info("Starting REAL ZisK Proof API - NO FAKE DATA")
+    logger.info("System will ONLY process real submitted scores")
+    logger.info("All mock/fake implementations have been REMOVED")
+    logger.info("Enhanced with bulletproof worker system and psutil-free process management")
+    logger.info("BULLETPROOF DUPLICATE PREVENTION ENABLED - 30 second window")
+    
+    start_background_services()
     
     logger.info("API available at: http://localhost:8000")
     logger.info("Submit real scores via POST /api/submit-score")
     
+    # Treat SIGTERM like Ctrl+C so `kill` stops the server the same way
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    
     try:
-        app.run(host='0.0.0.0', port=8000, debug=True, threaded=True)
-    except KeyboardInterrupt:
+        # Debug mode only on request; the reloader stays off because it would start a second set of workers
+        debug = os.environ.get('FLASK_DEBUG') == '1'
+        app.run(host='0.0.0.0', port=8000, debug=debug, use_reloader=False, threaded=True)
+    finally:
+        # app.run swallows KeyboardInterrupt and returns, so stop the workers here rather than
+        # leaving it to atexit - a proof in progress gets the same bounded wait either way
         logger.info("🛑 Received shutdown signal...")
         cleanup_workers_on_shutdown()
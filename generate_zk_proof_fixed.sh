@@ -274,7 +274,12 @@ echo ""
 log_info "Step 2: Building ZisK program"
 echo "================================"
 
-if ! execute_with_completion_check "cargo-zisk build --release" "ZisK build" "target/riscv64ima-zisk-zkvm-elf/release/flappy_zisk"; then
+ELF_PATH="target/riscv64ima-zisk-zkvm-elf/release/flappy_zisk"
+
+# The guest program does not depend on the score - only rebuild when its sources changed
+if [ -f "$ELF_PATH" ] && [ -z "$(find src Cargo.toml build.rs -newer "$ELF_PATH" 2>/dev/null)" ]; then
+    log_info "ZisK program is up to date, skipping build"
+elif ! execute_with_completion_check "cargo-zisk build --release" "ZisK build" "$ELF_PATH"; then
     log_error "Step 2 failed"
     exit 1
 fi
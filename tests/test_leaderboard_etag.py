@@ -0,0 +1,82 @@
+"""Conditional GETs on the leaderboard endpoints, with and without flask-compress"""
+import pytest
+
+import api_server
+
+DIFFICULTY = 7  # Kept apart from anything else the process may have recorded
+
+
+@pytest.fixture
+def client():
+    entry = {
+        'job_id': 'etag-test-job',
+        'player_id': 'etag_tester_' + 'x' * 2000,  # Pushes the body past COMPRESS_MIN_SIZE
+        'score': 42,
+        'difficulty': DIFFICULTY,
+        'game_id': 1,
+        'timestamp': '2024-01-01T00:00:00',
+        'proof_status': 'pending',
+    }
+    total_scores = api_server.leaderboard_total_scores
+    with api_server.leaderboard_lock:
+        api_server.insert_leaderboard_entry(DIFFICULTY, entry)
+    yield api_server.app.test_client()
+    with api_server.leaderboard_lock:
+        for scored in api_server.leaderboard.pop(DIFFICULTY, []):
+            api_server.leaderboard_views.pop(scored['job_id'], None)
+        api_server.leaderboard_keys.pop(DIFFICULTY, None)
+        api_server.leaderboard_total_scores = total_scores
+        api_server.invalidate_leaderboard_responses(DIFFICULTY)
+
+
+@pytest.mark.parametrize('path', [f'/api/leaderboard/{DIFFICULTY}', '/api/leaderboard'])
+def test_uncompressed_revalidation_returns_304(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    
+    again = client.get(path, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+@pytest.mark.parametrize('path', [f'/api/leaderboard/{DIFFICULTY}', '/api/leaderboard'])
+def test_weak_validator_returns_304(client, path):
+    etag = client.get(path).headers['ETag']
+    weak_etag = 'W/' + etag
+    
+    again = client.get(path, headers={'If-None-Match': f'"unrelated", {weak_etag}'})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == weak_etag
+
+
+@pytest.mark.parametrize('path', [f'/api/leaderboard/{DIFFICULTY}', '/api/leaderboard'])
+def test_compressed_revalidation_returns_304(client, path, monkeypatch):
+    pytest.importorskip('flask_compress')
+    # Older flask-compress releases never re-check If-None-Match after compressing - make sure
+    # the endpoint matches the suffixed tag on its own
+    monkeypatch.setitem(api_server.app.config, 'COMPRESS_EVALUATE_CONDITIONAL_REQUEST', False)
+    
+    first = client.get(path, headers={'Accept-Encoding': 'gzip'})
+    assert first.status_code == 200
+    assert first.headers['Content-Encoding'] == 'gzip'
+    etag = first.headers['ETag']
+    assert etag.endswith(':gzip"')
+    
+    again = client.get(path, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+
+def test_changed_leaderboard_is_served_again(client):
+    path = f'/api/leaderboard/{DIFFICULTY}'
+    etag = client.get(path).headers['ETag']
+    
+    with api_server.leaderboard_lock:
+        api_server.insert_leaderboard_entry(DIFFICULTY, {
+            'job_id': 'etag-test-job-2', 'player_id': 'p2', 'score': 50, 'difficulty': DIFFICULTY,
+            'game_id': 2, 'timestamp': '2024-01-01T00:00:01', 'proof_status': 'pending',
+        })
+    
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 200
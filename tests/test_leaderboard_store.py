@@ -0,0 +1,120 @@
+"""SQLite write-through of the leaderboard: upserts, eviction, the per-difficulty cap and reload"""
+import sqlite3
+import time
+import uuid
+
+import pytest
+
+import api_server
+
+DIFFICULTY = 1
+
+
+def reset_leaderboard(monkeypatch):
+    """Give the module an empty in-memory leaderboard (monkeypatch puts the real one back)"""
+    monkeypatch.setattr(api_server, 'leaderboard', {})
+    monkeypatch.setattr(api_server, 'leaderboard_keys', {})
+    monkeypatch.setattr(api_server, 'leaderboard_views', {})
+    monkeypatch.setattr(api_server, 'leaderboard_response_cache', {})
+    monkeypatch.setattr(api_server, 'leaderboard_total_scores', 0)
+    monkeypatch.setattr(api_server, 'leaderboard_db', None)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_server, 'LEADERBOARD_MAX_ENTRIES', 2)
+    reset_leaderboard(monkeypatch)
+    path = str(tmp_path / 'leaderboard.db')
+    api_server.init_leaderboard_db(path)
+    yield path
+    api_server.leaderboard_db.close()
+
+
+def restart(db_path, monkeypatch):
+    """Drop the in-memory board and load it back from the store, as a server restart would"""
+    api_server.leaderboard_db.close()
+    reset_leaderboard(monkeypatch)
+    api_server.init_leaderboard_db(db_path)
+
+
+def submit(score, player_id='player'):
+    job = api_server.ProofJob(str(uuid.uuid4()), player_id, score, DIFFICULTY)
+    job.game_id = 1
+    return job, api_server.record_leaderboard_score(job)
+
+
+def stored_rows(db_path):
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute(
+            'SELECT rowid, job_id, score, proof_status FROM scores ORDER BY rowid'
+        ).fetchall()
+
+
+def board_job_ids():
+    return [entry['job_id'] for entry in api_server.leaderboard.get(DIFFICULTY, [])]
+
+
+def test_proof_update_upserts_row_in_place(db_path, monkeypatch):
+    first, _ = submit(10)
+    second, _ = submit(10)
+    rowids_before = [row[0] for row in stored_rows(db_path)]
+
+    first.status = api_server.ProofStatus.COMPLETED
+    first.completed_at = time.time()
+    api_server.update_leaderboard_with_real_proof(first)
+
+    rows = stored_rows(db_path)
+    assert [row[0] for row in rows] == rowids_before
+    assert [(row[1], row[3]) for row in rows] == [
+        (first.job_id, 'completed'),
+        (second.job_id, 'pending'),
+    ]
+
+    # rowid is the tie-break, so the equal scores come back in submission order
+    restart(db_path, monkeypatch)
+    assert board_job_ids() == [first.job_id, second.job_id]
+    assert api_server.leaderboard[DIFFICULTY][0]['proof_status'] == 'completed'
+
+
+def test_evicted_entry_is_deleted(db_path):
+    lowest, _ = submit(10)
+    submit(20)
+    submit(30)
+
+    assert lowest.leaderboard_entry['evicted']
+    assert lowest.job_id not in board_job_ids()
+    assert lowest.job_id not in [row[1] for row in stored_rows(db_path)]
+
+    # A proof finishing after the eviction must not write the row back
+    lowest.status = api_server.ProofStatus.COMPLETED
+    lowest.completed_at = time.time()
+    api_server.update_leaderboard_with_real_proof(lowest)
+    assert [row[2] for row in stored_rows(db_path)] == [20, 30]
+
+
+def test_score_below_full_board_is_not_stored(db_path):
+    submit(20)
+    submit(30)
+
+    job, position = submit(20)  # Ties the last place, which keeps its spot
+
+    assert position is None
+    assert job.leaderboard_entry is None
+    assert len(stored_rows(db_path)) == 2
+
+
+def test_reload_restores_board_and_prunes_rows_past_cap(db_path, monkeypatch):
+    submit(30, 'a')
+    submit(20, 'b')
+    api_server.leaderboard_db.execute(  # Written before the store was capped
+        'INSERT INTO scores (job_id, player_id, score, difficulty, timestamp, proof_status) VALUES (?, ?, ?, ?, ?, ?)',
+        ('overflow', 'c', 10, DIFFICULTY, '2024-01-01T00:00:00', 'completed')
+    )
+
+    restart(db_path, monkeypatch)
+
+    assert [entry['player_id'] for entry in api_server.leaderboard[DIFFICULTY]] == ['a', 'b']
+    assert api_server.leaderboard_total_scores == 2
+    # Their proofs were still pending when the old process went away
+    assert {row[3] for row in stored_rows(db_path)} == {'failed'}
+    assert 'overflow' not in [row[1] for row in stored_rows(db_path)]